@@ -16,18 +16,160 @@ If excel_file_path is not provided, looks for Excel files in current directory.
 
 import sys
 import os
+import gzip
+import hashlib
+import io
 import json
+import string
+import traceback
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from collections import Counter
+from typing import Dict, List, Any, NamedTuple, Optional
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import ahocorasick
+except ImportError:  # optional: falls back to per-keyword substring scans
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to stdlib json serialization
+    orjson = None
 
 # Configuration
 OUTPUT_DIR = Path('outputs')
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Content hashes for the skip-rewrite check live outside outputs/ so the
+# cache never shows up among the generated deliverables.
+CACHE_DIR = Path('.cache')
+CACHE_DIR.mkdir(exist_ok=True)
+
+# Write step 4 diagrams gzip-compressed as .svgz (browsers open these
+# natively). Level 1 trades a little CPU for much smaller files; off by
+# default so the plain .svg outputs stay directly viewable in the repo.
+SVG_COMPRESS = False
+
+# Precompiled entity-classification patterns. These are applied once per candidate
+# word per row in Step 1, so compiling them at import time avoids rebuilding the
+# same regexes inside the hot classification loop.
+_PERSON_CTX_RE = re.compile(r'\b(individual|person|people|human|citizen|resident|member|participant)\b')
+_ORG_CTX_RE = re.compile(r'\b(company|organization|organisation|institution|corp|corporation|business|firm|enterprise)\b')
+_PRODUCT_CTX_RE = re.compile(r'\b(product|item|goods|merchandise|commodity|article|sku)\b')
+_FIELDGROUP_CTX_RE = re.compile(r'\b(address|phone|email|e-mail|telephone|contact)\b')
+_FIELDGROUP_NAME_RE = re.compile(r'^(address|phone|email|e-mail|telephone|contact)$')
+
+# Patterns that previously embedded re.escape(word) and were recompiled per word per
+# row. They capture the one or two words following the qualifier; the classification
+# loop then checks the candidate word against the captured words instead.
+_MULTI_QUALIFIER_RE = re.compile(r'\b(?:multiple|each|per|1-to-many|one-to-many|many)\s+(\w*)\s*(\w*)')
+_CONTAINMENT_RE = re.compile(r'\b(?:has|have|contains|includes|with)\s+(\w*)\s*(\w*)')
+
+
+# Filter out common words that aren't entities
+_COMMON_EXCLUDE_WORDS = frozenset({
+    'Solution', 'System', 'Data', 'Record', 'Information', 'Field', 'Attribute',
+    'Value', 'Type', 'Status', 'Date', 'Number', 'Code', 'ID', 'Key', 'Source',
+    'Target', 'The', 'This', 'That', 'These', 'Those', 'Each', 'Every', 'All',
+    'Some', 'Any', 'Many', 'More', 'Most', 'Such', 'Which', 'What', 'When',
+    'Where', 'How', 'Why', 'Who', 'Table', 'Column', 'Row', 'Sheet', 'File',
+    'Document', 'Report', 'Format', 'Structure', 'Model', 'Design', 'Process',
+    'Step', 'Phase', 'Feature', 'Function', 'Method', 'Approach', 'Integration'
+})
+
+# MDM FOCUS: Exclude source system names - these are data sources, not master entities
+SOURCE_SYSTEM_NAMES = frozenset({
+    'Banner', 'Workday', 'Slate', 'Salesforce', 'SFAQ', 'AffinaQuest',
+    'IAM', 'SF-STU', 'Slack', 'Snowflake', 'Azure', 'Reference', 'Use'
+})
+
+EXCLUDE_WORDS = _COMMON_EXCLUDE_WORDS | SOURCE_SYSTEM_NAMES
+
+# Keys of the per-FR records, interned once so the many small dicts built in
+# Step 1 share key objects instead of re-hashing fresh strings per row
+_FR_KEYS = tuple(map(sys.intern, ('fr_number', 'description', 'comments', 'combined_text')))
+
+
+class Entity(NamedTuple):
+    """Business entity identified in Step 1. Kept as a NamedTuple in memory to
+    avoid per-record dict key storage; converted to a dict only when the Step 1
+    output is serialized to JSON."""
+    name: str
+    type: str
+    purpose: str
+
+
+# Known source systems and the keywords/connection types used to detect them
+KNOWN_SOURCES = {
+    'Banner': {'connection_types': ['JDBC', 'jdbc'], 'keywords': ['banner', 'ellucian banner']},
+    'Workday': {'connection_types': ['SOAP API', 'SOAP', 'soap'], 'keywords': ['workday']},
+    'Slate': {'connection_types': ['API', 'api'], 'keywords': ['slate']},
+    'Salesforce': {'connection_types': ['API', 'api'], 'keywords': ['salesforce', 'sf']},
+    'SFAQ': {'connection_types': ['API', 'api'], 'keywords': ['sfaq', 'affinaquest']},
+    'AffinaQuest': {'connection_types': ['API', 'api'], 'keywords': ['affinaquest', 'sfaq']},
+    'IAM': {'connection_types': ['API', 'Message Queue', 'RabbitMQ'], 'keywords': ['iam']},
+    'SF-STU': {'connection_types': ['API', 'api'], 'keywords': ['sf-stu', 'sfstu']},
+    'Slack': {'connection_types': ['API', 'api'], 'keywords': ['slack']},
+    'Snowflake': {'connection_types': ['Database', 'database'], 'keywords': ['snowflake']}
+}
+
+# Keyword -> source names sharing that keyword (e.g. 'sfaq' maps to both SFAQ
+# and AffinaQuest), lowercased once at import time.
+_KEYWORD_SOURCES: Dict[str, frozenset] = {}
+for _name, _info in KNOWN_SOURCES.items():
+    for _kw in _info['keywords']:
+        _kw = _kw.lower()
+        _KEYWORD_SOURCES[_kw] = frozenset(_KEYWORD_SOURCES.get(_kw, frozenset()) | {_name})
+del _name, _info, _kw
+
+
+def _build_source_automaton():
+    """Build an Aho-Corasick automaton over all source keywords, or None when
+    pyahocorasick is not installed."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword, names in _KEYWORD_SOURCES.items():
+        automaton.add_word(keyword, names)
+    automaton.make_automaton()
+    return automaton
+
+
+_SOURCE_AUTOMATON = _build_source_automaton()
+
+
+def _scan_source_mentions(combined_rows_lower: List[str]) -> Dict[str, int]:
+    """Map each detected source system to the index of its first mentioning row.
+
+    Uses a single Aho-Corasick pass per row when available; otherwise one
+    substring test per keyword per row.
+    """
+    first_rows: Dict[str, int] = {}
+    if _SOURCE_AUTOMATON is not None:
+        for row_idx, combined_lower in enumerate(combined_rows_lower):
+            for _, names in _SOURCE_AUTOMATON.iter(combined_lower):
+                for name in names:
+                    first_rows.setdefault(name, row_idx)
+    else:
+        for row_idx, combined_lower in enumerate(combined_rows_lower):
+            for keyword, names in _KEYWORD_SOURCES.items():
+                if keyword in combined_lower:
+                    for name in names:
+                        first_rows.setdefault(name, row_idx)
+    return first_rows
+
+
+def _follows_qualifier(word_lower: str, pairs: List[tuple]) -> bool:
+    """Check whether word_lower occurs where an embedded-word regex would have matched:
+    anywhere inside the first captured word, or as a prefix of the second."""
+    return any(word_lower in first or second.startswith(word_lower)
+               for first, second in pairs)
+
 # Step workflow definition
 STEP_WORKFLOW = [
     {
@@ -64,32 +206,38 @@ STEP_WORKFLOW = [
     }
 ]
 
+# Fold the output-type checks main() needs into each entry once at import
+for _step in STEP_WORKFLOW:
+    _step['is_json_output'] = isinstance(_step['output'], str) and _step['output'].endswith('.json')
+    _step['has_md'] = bool(_step['output_md'])
+del _step
+
 # OOTB Definitions
 OOTB_ENTITIES = {
     'Person': {
         'purpose': 'Represents individuals/people in the system',
-        'standard_fields': [
+        'standard_fields': (
             'FirstName', 'LastName', 'MiddleName', 'NamePrefix', 'NameSuffix',
             'FullName', 'DateOfBirth', 'Gender', 'MaritalStatus',
             'SSN', 'TaxID', 'PreferredLanguage', 'DeceasedDate', 'DeceasedFlag'
-        ],
+        ),
         'standard_field_groups': ['Address', 'Phone', 'Email', 'Identifier']
     },
     'Organization': {
         'purpose': 'Represents organizations, companies, institutions',
-        'standard_fields': [
+        'standard_fields': (
             'OrganizationName', 'LegalName', 'DBA', 'TaxID', 'EIN',
             'OrganizationType', 'Industry', 'Status', 'FoundedDate',
             'Website', 'Description'
-        ],
+        ),
         'standard_field_groups': ['Address', 'Phone', 'Email', 'Identifier']
     },
     'Product': {
         'purpose': 'Represents products or items',
-        'standard_fields': [
+        'standard_fields': (
             'ProductName', 'ProductCode', 'SKU', 'Description',
             'Category', 'Brand', 'Status', 'Price', 'UnitOfMeasure'
-        ],
+        ),
         'standard_field_groups': ['Identifier']
     }
 }
@@ -97,35 +245,114 @@ OOTB_ENTITIES = {
 OOTB_FIELD_GROUPS = {
     'Address': {
         'purpose': 'Stores address information (1-to-many relationship)',
-        'standard_fields': [
+        'standard_fields': (
             'AddressLine1', 'AddressLine2', 'City', 'State', 'PostalCode',
             'Country', 'AddressType', 'PrimaryFlag', 'StartDate', 'EndDate',
             'County', 'Region', 'Latitude', 'Longitude'
-        ]
+        )
     },
     'Phone': {
         'purpose': 'Stores phone/contact number information (1-to-many relationship)',
-        'standard_fields': [
+        'standard_fields': (
             'PhoneNumber', 'PhoneType', 'PrimaryFlag', 'CountryCode',
             'AreaCode', 'Extension', 'StartDate', 'EndDate', 'DoNotCallFlag'
-        ]
+        )
     },
     'Email': {
         'purpose': 'Stores email address information (1-to-many relationship)',
-        'standard_fields': [
+        'standard_fields': (
             'EmailAddress', 'EmailType', 'PrimaryFlag', 'StartDate', 'EndDate',
             'DoNotEmailFlag', 'BounceFlag'
-        ]
+        )
     },
     'Identifier': {
         'purpose': 'Stores various identifier values (1-to-many relationship)',
-        'standard_fields': [
+        'standard_fields': (
             'IdentifierValue', 'IdentifierType', 'PrimaryFlag', 'Issuer',
             'StartDate', 'EndDate', 'VerificationStatus'
-        ]
+        )
     }
 }
 
+# Canonical field lists for inferred custom field groups (shared, not rebuilt
+# per CustomFieldGroup requirement)
+ROLE_FG_FIELDS = ('RoleType', 'RoleStatus', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey')
+RELATIONSHIP_FG_FIELDS = ('RelatedConstituentId', 'RelationshipType', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey')
+GENERIC_FG_FIELDS = ('Type', 'Status', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey')
+
+
+# These attribute keywords are relatively generic but could be more so;
+# expand or adjust for maximum generality if needed for other domains
+ATTRIBUTE_KEYWORDS = {
+    'classification': ['classification', 'classify'],
+    'employmentstatus': ['full time', 'part time', 'employment status', 'employment type', 'temp', 'temporary', 'permanent'],
+    'roletype': ['role type', 'role', 'roletype', 'position'],
+    'relationshiptype': ['relationship type', 'relationship', 'relationshiptype', 'association'],
+    # Organization attributes that might need to be added to Person
+    'organizationname': ['organization name', 'company name', 'org name'],
+    'legalname': ['legal name', 'legal entity name'],
+    'dba': ['dba', 'doing business as', 'trade name'],
+    'ein': ['ein', 'employer identification number'],
+    'organizationtype': ['organization type', 'org type', 'entity type'],
+    'industry': ['industry', 'sector'],
+    'website': ['website', 'web site', 'url'],
+    'foundeddate': ['founded', 'founded date', 'established', 'established date'],
+    'description': ['description', 'desc'],
+    'status': ['status', 'active', 'inactive']
+}
+
+# (display name, compiled keyword alternation) per attribute, derived once at
+# import so neither the display-name derivation nor the regex compilation runs
+# inside Step 1
+_ATTR_TABLE = tuple(
+    (attr_name.replace('type', 'Type').replace('status', 'Status').title(),
+     re.compile('|'.join(re.escape(keyword) for keyword in keywords)))
+    for attr_name, keywords in ATTRIBUTE_KEYWORDS.items()
+)
+
+# Fields never promoted to custom attributes on the consolidated entity
+PERSON_ONLY_EXCLUSIONS = frozenset({'TaxID'})
+
+# Person PII fields kept out of extracted attribute lists, and the filtered
+# field tuple they produce, computed once at import instead of per run
+_PERSON_PII_FIELDS = frozenset({'SSN', 'TaxID'})
+_PERSON_OOTB_FIELDS_NO_PII = tuple(
+    f for f in OOTB_ENTITIES['Person']['standard_fields'] if f not in _PERSON_PII_FIELDS
+)
+
+
+def _content_hash(obj: Any, volatile_keys: tuple = ()) -> str:
+    """Hash a step output for change detection, ignoring volatile keys such as
+    run timestamps so reruns over identical inputs hash identically."""
+    hashable = {k: v for k, v in obj.items() if k not in volatile_keys}
+    if orjson is not None:
+        payload = orjson.dumps(hashable)
+    else:
+        payload = json.dumps(hashable, sort_keys=True).encode()
+    return hashlib.blake2b(payload).hexdigest()
+
+
+def _dump_json(obj: Any, path: Path) -> None:
+    """Write obj as indented JSON in a single call, via orjson when installed."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(obj, indent=2))
+
+
+def _walk(directory) -> Any:
+    """Yield every file path under directory, depth first.
+
+    scandir-based: directory entries carry cached file-type info, so no
+    per-entry stat calls or Path allocations as with rglob().
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk(entry.path)
+            elif entry.is_file():
+                yield entry.path
+
 
 def find_excel_file(excel_path: Optional[str] = None) -> Path:
     """Find the Excel file to process."""
@@ -135,20 +362,28 @@ def find_excel_file(excel_path: Optional[str] = None) -> Path:
             raise FileNotFoundError(f"Excel file not found: {excel_path}")
         return excel_file
     
-    # Look for Excel files in current directory
-    excel_files = list(Path('.').glob('*.xlsx'))
+    # Look for Excel files in current directory. scandir avoids the per-entry
+    # stat calls and Path construction that glob() performs for non-matches.
+    with os.scandir('.') as entries:
+        excel_files = [entry.name for entry in entries
+                       if entry.is_file() and entry.name.endswith('.xlsx')]
     if not excel_files:
         raise FileNotFoundError("No Excel (.xlsx) file found in current directory")
     if len(excel_files) > 1:
         print(f"Warning: Multiple Excel files found. Using: {excel_files[0]}")
-    return excel_files[0]
+    return Path(excel_files[0])
 
 
-def validate_step_input(step: Dict, previous_output: Optional[str] = None) -> bool:
+def validate_step_input(step: Dict, previous_output: Optional[Dict] = None) -> bool:
     """Validate that required input exists for a step."""
     if step['input'] == 'excel_file':
         return True  # Excel file validated separately
-    
+
+    # Short-circuit: the previous step just produced this output in-process,
+    # so the on-disk check is redundant
+    if isinstance(previous_output, dict) and previous_output.get('_validated'):
+        return True
+
     input_path = OUTPUT_DIR / step['input']
     if not input_path.exists():
         print(f"❌ ERROR: Step {step['num']} input file not found: {input_path}")
@@ -168,31 +403,57 @@ def step1_extract_requirements(excel_file: Path) -> Dict[str, Any]:
     print("\n" + "="*80)
     print("STEP 1: EXTRACTING MDM REQUIREMENTS (Identifying Master Entities)")
     print("="*80)
-    
-    # Read Excel file
+
+    step_cfg = STEP_WORKFLOW[0]
+    json_path = OUTPUT_DIR / step_cfg['output']
+    md_path = OUTPUT_DIR / step_cfg['output_md']
+    now_iso = datetime.now().isoformat()
+
+    # Read Excel file. Open the workbook once, prefer the calamine engine when
+    # installed (substantially faster than openpyxl on large sheets), and only
+    # parse the three columns the pipeline actually uses. dtype=str skips
+    # pandas' type inference pass.
     try:
-        df = pd.read_excel(excel_file, sheet_name='Functional Requirements')
-    except ValueError as e:
-        raise ValueError(f"Sheet 'Functional Requirements' not found in Excel file. Available sheets: {pd.ExcelFile(excel_file).sheet_names}")
-    
+        workbook = pd.ExcelFile(excel_file, engine='calamine')
+    except ImportError:
+        workbook = pd.ExcelFile(excel_file)
+    if 'Functional Requirements' not in workbook.sheet_names:
+        raise ValueError(f"Sheet 'Functional Requirements' not found in Excel file. Available sheets: {workbook.sheet_names}")
+    # A callable usecols tolerates absent columns (a list would raise), so
+    # partially-filled sheets still run end to end like they always have
+    df = workbook.parse(sheet_name='Functional Requirements',
+                        usecols=lambda c: c in {'FR #', 'Functional Requirements Description', 'Comments'},
+                        dtype=str)
+
     print(f"Loaded {len(df)} functional requirements from Excel")
-    
+
+    # Pull the three working columns out once as vectorized Series. Every later
+    # extraction phase reuses these instead of re-walking the DataFrame with
+    # iterrows(), which materializes a Series per row. Missing columns default
+    # to empty values, matching the old per-row .get() behavior.
+    empty_col = pd.Series([''] * len(df))
+    descs = (df['Functional Requirements Description'].fillna('').astype(str)
+             if 'Functional Requirements Description' in df.columns else empty_col)
+    comms = (df['Comments'].fillna('').astype(str)
+             if 'Comments' in df.columns else empty_col)
+    combined_rows = (descs + ' ' + comms).tolist()
+    combined_rows_lower = [t.lower() for t in combined_rows]
+    fr_nums_raw = df['FR #'] if 'FR #' in df.columns else [None] * len(df)
+
     # Extract requirements with FR references
     functional_requirements = []
-    for idx, row in df.iterrows():
-        fr_num = str(row.get('FR #', f'FR{idx+1}')).strip() if pd.notna(row.get('FR #')) else f'FR{idx+1}'
-        fr_desc = str(row.get('Functional Requirements Description', '')).strip()
-        fr_comments = str(row.get('Comments', '')).strip() if pd.notna(row.get('Comments')) else ''
-        functional_requirements.append({
-            'fr_number': fr_num,
-            'description': fr_desc,
-            'comments': fr_comments,
-            'combined_text': (fr_desc + ' ' + fr_comments).lower()
-        })
+    for idx, (fr_raw, fr_desc, fr_comments) in enumerate(zip(fr_nums_raw, descs.str.strip(), comms.str.strip())):
+        fr_num = str(fr_raw).strip() if pd.notna(fr_raw) else f'FR{idx+1}'
+        functional_requirements.append(dict(zip(_FR_KEYS, (
+            fr_num,
+            fr_desc,
+            fr_comments,
+            (fr_desc + ' ' + fr_comments).lower()
+        ))))
     
     # Extract requirements
     step1_output = {
-        'extraction_date': datetime.now().isoformat(),
+        'extraction_date': now_iso,
         'total_requirements': len(df),
         'source_file': str(excel_file),
         'functional_requirements': functional_requirements,  # Store FRs for traceability
@@ -209,97 +470,99 @@ def step1_extract_requirements(excel_file: Path) -> Dict[str, Any]:
     # Strategy: Extract capitalized nouns that appear multiple times, then classify them
     entities_found = {}
     
-    # Collect all text
-    all_text_lower = ' '.join([str(row.get('Functional Requirements Description', '')) + ' ' + 
-                               str(row.get('Comments', '')) for _, row in df.iterrows()]).lower()
-    all_text_original = ' '.join([str(row.get('Functional Requirements Description', '')) + ' ' + 
-                                  str(row.get('Comments', '')) for _, row in df.iterrows()])
+    # Collect all text in one pass over the combined rows
+    all_text_original = ' '.join(combined_rows)
     
     # Extract potential entity names (capitalized words that appear multiple times)
     # Common patterns: "Entity name", "Entity", "Entity records"
     potential_entities = {}
     
-    # Pattern 1: Standalone capitalized nouns (likely entity names)
-    capitalized_words = re.findall(r'\b([A-Z][a-z]+)\b', all_text_original)
-    word_counts = Counter(capitalized_words)
-    
-    # Filter out common words that aren't entities
-    exclude_words = {'Solution', 'System', 'Data', 'Record', 'Information', 'Field', 'Attribute',
-                    'Value', 'Type', 'Status', 'Date', 'Number', 'Code', 'ID', 'Key', 'Source',
-                    'Target', 'The', 'This', 'That', 'These', 'Those', 'Each', 'Every', 'All',
-                    'Some', 'Any', 'Many', 'More', 'Most', 'Such', 'Which', 'What', 'When',
-                    'Where', 'How', 'Why', 'Who', 'Table', 'Column', 'Row', 'Sheet', 'File',
-                    'Document', 'Report', 'Format', 'Structure', 'Model', 'Design', 'Process',
-                    'Step', 'Phase', 'Feature', 'Function', 'Method', 'Approach', 'Integration'}
-    
-    # MDM FOCUS: Exclude source system names - these are data sources, not master entities
-    source_system_names = {'Banner', 'Workday', 'Slate', 'Salesforce', 'SFAQ', 'AffinaQuest', 
-                          'IAM', 'SF-STU', 'Slack', 'Snowflake', 'Azure', 'Reference', 'Use'}
-    exclude_words.update(source_system_names)
-    
-    # Find entities mentioned frequently (likely important entities)
+    # Pattern 1: Standalone capitalized nouns (likely entity names). Excluded
+    # words are filtered out before counting so they never enter the
+    # classification loop below.
+    word_counts = Counter(w for w in re.findall(r'\b[A-Z][a-z]+\b', all_text_original)
+                          if w not in EXCLUDE_WORDS)
+    
+    # Pre-scan each row once for qualifier patterns so the per-word classification
+    # below does not have to rebuild word-specific regexes or re-walk the DataFrame.
+    # The per-row lowercase text is computed here exactly once and shared across
+    # every candidate word's classification pass.
+    row_texts = []
+    for text, text_lower in zip(combined_rows, combined_rows_lower):
+        row_texts.append((
+            text,
+            text_lower,
+            _MULTI_QUALIFIER_RE.findall(text_lower),
+            _CONTAINMENT_RE.findall(text_lower)
+        ))
+
+    # Find entities mentioned frequently (likely important entities). Each
+    # candidate came out of the corpus itself, so no corpus membership check is
+    # needed before classifying it.
     for word, count in word_counts.items():
-        if count >= 3 and word not in exclude_words:
+        if count >= 3:
             word_lower = word.lower()
-            # Check if this word appears in meaningful contexts
-            if word_lower in all_text_lower:
-                # Determine entity type based on context clues
-                entity_type = None
-                context = []
-                
-                # Check context to determine type
-                for _, row in df.iterrows():
-                    text = str(row.get('Functional Requirements Description', '')) + ' ' + str(row.get('Comments', ''))
-                    text_lower = text.lower()
-                    
-                    # Determine entity type based on context patterns (no hardcoded entity names)
-                    if word_lower in text_lower:
-                        # Check for field group indicators (1-to-many relationships)
-                        # Look for patterns indicating multiple records per entity
-                        field_group_patterns = re.search(r'\b(multiple|each|per|1-to-many|one-to-many|many)\s+\w*\s*' + re.escape(word_lower), text_lower)
-                        if field_group_patterns:
-                            # Check if it's a standard OOTB field group type by checking for standard field group names
-                            # in surrounding context
-                            if re.search(r'\b(address|phone|email|e-mail|telephone|contact)\b', text_lower[:text_lower.find(word_lower)+200]):
-                                entity_type = 'FieldGroup'
-                            else:
-                                entity_type = 'CustomFieldGroup'
-                        
-                        # Check for person/individual context using semantic patterns (not hardcoded names)
-                        # Look for patterns like "individuals", "people", "persons", or personal attributes
-                        elif re.search(r'\b(individual|person|people|human|citizen|resident|member|participant)\b', text_lower):
-                            entity_type = 'Person'
-                        
-                        # Check for organization context using semantic patterns
-                        elif re.search(r'\b(company|organization|organisation|institution|corp|corporation|business|firm|enterprise)\b', text_lower):
-                            entity_type = 'Organization'
-                        
-                        # Check for product/item context using semantic patterns
-                        elif re.search(r'\b(product|item|goods|merchandise|commodity|article|sku)\b', text_lower):
-                            entity_type = 'Product'
-                        
-                        # If entity is mentioned in context suggesting it's a child/related entity
-                        elif re.search(r'\b(has|have|contains|includes|with)\s+\w*\s*' + re.escape(word_lower), text_lower):
-                            entity_type = 'CustomFieldGroup'
-                        
-                        if text_lower not in context:
-                            context.append(text[:200])
-                
-                # Final classification if still undetermined (use heuristics, not hardcoded names)
-                if not entity_type:
-                    # Check word itself for semantic clues (common field group terms)
-                    if re.match(r'^(address|phone|email|e-mail|telephone|contact)$', word_lower):
+            # Determine entity type based on context clues
+            entity_type = None
+            context = []
+            seen_context_texts = set()
+
+            # Check context to determine type
+            for text, text_lower, multi_pairs, contain_pairs in row_texts:
+                # Cheap substring test before any pattern work; most rows miss.
+                # The match position is reused for the context-window slice.
+                pos = text_lower.find(word_lower)
+                if pos < 0:
+                    continue
+                # Determine entity type based on context patterns (no hardcoded entity names)
+                # Check for field group indicators (1-to-many relationships)
+                # Look for patterns indicating multiple records per entity
+                if _follows_qualifier(word_lower, multi_pairs):
+                    # Check if it's a standard OOTB field group type by checking for standard field group names
+                    # in surrounding context
+                    if _FIELDGROUP_CTX_RE.search(text_lower[:pos+200]):
                         entity_type = 'FieldGroup'
-                    # Default: treat as main entity (Person is most common OOTB entity type)
                     else:
-                        entity_type = 'Person'  # Default to Person, can be manually corrected if needed
-                
-                if entity_type:
-                    entities_found[word] = {
-                        'type': entity_type,
-                        'context': ' '.join(context[:3]),
-                        'frequency': count
-                    }
+                        entity_type = 'CustomFieldGroup'
+
+                # Check for person/individual context using semantic patterns (not hardcoded names)
+                # Look for patterns like "individuals", "people", "persons", or personal attributes
+                elif _PERSON_CTX_RE.search(text_lower):
+                    entity_type = 'Person'
+
+                # Check for organization context using semantic patterns
+                elif _ORG_CTX_RE.search(text_lower):
+                    entity_type = 'Organization'
+
+                # Check for product/item context using semantic patterns
+                elif _PRODUCT_CTX_RE.search(text_lower):
+                    entity_type = 'Product'
+
+                # If entity is mentioned in context suggesting it's a child/related entity
+                elif _follows_qualifier(word_lower, contain_pairs):
+                    entity_type = 'CustomFieldGroup'
+
+                # Only the first three distinct contexts are ever used, so stop
+                # collecting after that (classification still scans every row)
+                if len(context) < 3 and text_lower not in seen_context_texts:
+                    seen_context_texts.add(text_lower)
+                    context.append(text[:200])
+
+            # Final classification if still undetermined (use heuristics, not hardcoded names)
+            if not entity_type:
+                # Check word itself for semantic clues (common field group terms)
+                if _FIELDGROUP_NAME_RE.match(word_lower):
+                    entity_type = 'FieldGroup'
+                # Default: treat as main entity (Person is most common OOTB entity type)
+                else:
+                    entity_type = 'Person'  # Default to Person, can be manually corrected if needed
+            
+            if entity_type:
+                entities_found[word] = {
+                    'type': entity_type,
+                    'context': ' '.join(context[:3]),
+                    'frequency': count
+                }
     
     # MDM FOCUS: Build business entities list - filter to only master data entities
     # Master entities are: Person, Organization, Product (and their field groups)
@@ -332,100 +595,61 @@ def step1_extract_requirements(excel_file: Path) -> Dict[str, Any]:
             else:
                 purpose = f"{canonical_name} master entity in MDM model" if entity_type in ['Person', 'Organization', 'Product'] else f"{canonical_name} field group"
             
-            step1_output['business_entities'].append({
-                'name': canonical_name,  # Use canonical name for master entities
-                'type': entity_type,
-                'purpose': purpose
-            })
-    
-    # Extract source systems dynamically from Excel
-    source_systems_found = {}
-    known_sources = {
-        'Banner': {'connection_types': ['JDBC', 'jdbc'], 'keywords': ['banner', 'ellucian banner']},
-        'Workday': {'connection_types': ['SOAP API', 'SOAP', 'soap'], 'keywords': ['workday']},
-        'Slate': {'connection_types': ['API', 'api'], 'keywords': ['slate']},
-        'Salesforce': {'connection_types': ['API', 'api'], 'keywords': ['salesforce', 'sf']},
-        'SFAQ': {'connection_types': ['API', 'api'], 'keywords': ['sfaq', 'affinaquest']},
-        'AffinaQuest': {'connection_types': ['API', 'api'], 'keywords': ['affinaquest', 'sfaq']},
-        'IAM': {'connection_types': ['API', 'Message Queue', 'RabbitMQ'], 'keywords': ['iam']},
-        'SF-STU': {'connection_types': ['API', 'api'], 'keywords': ['sf-stu', 'sfstu']},
-        'Slack': {'connection_types': ['API', 'api'], 'keywords': ['slack']},
-        'Snowflake': {'connection_types': ['Database', 'database'], 'keywords': ['snowflake']}
-    }
-    
-    for _, row in df.iterrows():
-        desc = str(row.get('Functional Requirements Description', ''))
-        comments = str(row.get('Comments', ''))
-        combined = desc + ' ' + comments
-        
-        for source_name, source_info in known_sources.items():
-            if any(keyword.lower() in combined.lower() for keyword in source_info['keywords']):
-                if source_name not in source_systems_found:
-                    # Try to extract connection type from text
-                    connection = None
-                    for conn_type in source_info['connection_types']:
-                        if conn_type.lower() in combined.lower():
-                            connection = conn_type
-                            break
-                    if not connection:
-                        connection = source_info['connection_types'][0]  # Default to first
-                    
-                    source_systems_found[source_name] = {
-                        'name': source_name,
-                        'connection': connection,
-                        'context': combined[:200]
-                    }
-    
+            step1_output['business_entities'].append(Entity(
+                name=canonical_name,  # Use canonical name for master entities
+                type=entity_type,
+                purpose=purpose
+            ))
+    
+    # Extract source systems dynamically from Excel: one multi-pattern scan per
+    # row, then order results by first mentioning row (ties broken by the
+    # KNOWN_SOURCES declaration order) so output matches document order.
+    declaration_order = {name: i for i, name in enumerate(KNOWN_SOURCES)}
+    source_matches = []  # (first_row, declaration_order, source_record)
+    for source_name, first_row in _scan_source_mentions(combined_rows_lower).items():
+        combined = combined_rows[first_row]
+        combined_lower = combined_rows_lower[first_row]
+        # Try to extract connection type from the first mentioning row's text
+        connection_types = KNOWN_SOURCES[source_name]['connection_types']
+        connection = next((conn_type for conn_type in connection_types
+                           if conn_type.lower() in combined_lower),
+                          connection_types[0])
+        source_matches.append((first_row, declaration_order[source_name], {
+            'name': source_name,
+            'connection': connection,
+            'context': combined[:200]
+        }))
+    source_matches.sort(key=lambda m: (m[0], m[1]))
+    source_systems_found = {m[2]['name']: m[2] for m in source_matches}
+
     step1_output['source_systems'] = list(source_systems_found.values())
     
     # Extract custom attributes dynamically WITH FR REFERENCES
-    custom_attributes_with_fr = {}  # {attribute_name: [list of FR numbers]}
-    # These attribute keywords are relatively generic but could be more so;
-    # expand or adjust for maximum generality if needed for other domains
-    attribute_keywords = {
-        'classification': ['classification', 'classify'],
-        'employmentstatus': ['full time', 'part time', 'employment status', 'employment type', 'temp', 'temporary', 'permanent'],
-        'roletype': ['role type', 'role', 'roletype', 'position'],
-        'relationshiptype': ['relationship type', 'relationship', 'relationshiptype', 'association'],
-        # Organization attributes that might need to be added to Person
-        'organizationname': ['organization name', 'company name', 'org name'],
-        'legalname': ['legal name', 'legal entity name'],
-        'dba': ['dba', 'doing business as', 'trade name'],
-        'ein': ['ein', 'employer identification number'],
-        'organizationtype': ['organization type', 'org type', 'entity type'],
-        'industry': ['industry', 'sector'],
-        'website': ['website', 'web site', 'url'],
-        'foundeddate': ['founded', 'founded date', 'established', 'established date'],
-        'description': ['description', 'desc'],
-        'status': ['status', 'active', 'inactive']
-    }
-    
-    # Map attributes to FRs
-    for fr in functional_requirements:
-        fr_num = fr['fr_number']
-        combined_text = fr['combined_text']
-        
-        for attr_name, keywords in attribute_keywords.items():
-            if any(keyword in combined_text for keyword in keywords):
-                attr_display_name = attr_name.replace('type', 'Type').replace('status', 'Status').title()
-                if attr_display_name not in custom_attributes_with_fr:
-                    custom_attributes_with_fr[attr_display_name] = []
-                if fr_num not in custom_attributes_with_fr[attr_display_name]:
-                    custom_attributes_with_fr[attr_display_name].append(fr_num)
+    custom_attributes_with_fr = defaultdict(list)  # {attribute_name: [list of FR numbers]}
+
+    # Map attributes to FRs: one vectorized contains() pass per attribute using
+    # the display names and keyword alternations prebuilt at import time
+    fr_numbers = [fr['fr_number'] for fr in functional_requirements]
+    combined_texts = pd.Series([fr['combined_text'] for fr in functional_requirements])
+    for attr_display_name, pattern in _ATTR_TABLE:
+        mask = combined_texts.str.contains(pattern)
+        if not mask.any():
+            continue
+        matched_frs = custom_attributes_with_fr[attr_display_name]
+        for row_idx in mask.to_numpy().nonzero()[0]:
+            if fr_numbers[row_idx] not in matched_frs:
+                matched_frs.append(fr_numbers[row_idx])
     
     custom_attributes_found = set(custom_attributes_with_fr.keys())
     
 
-    ootb_person_attributes = [
-        field for field in OOTB_ENTITIES['Person']['standard_fields']
-        if field not in ['SSN', 'TaxID']
-    ]
+    ootb_person_attributes = _PERSON_OOTB_FIELDS_NO_PII
     
     # Determine which entity to use (first Person-type entity found, or default to Constituent)
     main_entity_name = 'Constituent'
     for entity in step1_output['business_entities']:
-        if entity['type'] == 'Person':
-            main_entity_name = entity['name']
+        if entity.type == 'Person':
+            main_entity_name = entity.name
             break
     
     # Store attributes with FR references
@@ -447,14 +671,12 @@ def step1_extract_requirements(excel_file: Path) -> Dict[str, Any]:
         'administrator', 'user', 'guest', 'applicant'
     ]
     
-    for _, row in df.iterrows():
-        desc = str(row.get('Functional Requirements Description', '')).lower()
-        comments = str(row.get('Comments', '')).lower()
-        combined = desc + ' ' + comments
-        
-        for role_keyword in role_keywords:
-            if role_keyword in combined and role_keyword.title() not in roles_found:
-                roles_found[role_keyword.title()] = {'name': role_keyword.title(), 'context': combined[:150]}
+    # Titles are computed once here rather than per row inside the scan
+    role_titles = [(role_keyword, role_keyword.title()) for role_keyword in role_keywords]
+    for combined in combined_rows_lower:
+        for role_keyword, role_title in role_titles:
+            if role_keyword in combined and role_title not in roles_found:
+                roles_found[role_title] = {'name': role_title, 'context': combined[:150]}
     
     step1_output['roles'] = [{'name': role['name'], 'purpose': role['context'][:100] + '...'} 
                              for role in roles_found.values()]
@@ -475,26 +697,33 @@ def step1_extract_requirements(excel_file: Path) -> Dict[str, Any]:
         {'rule': 'Lookup value mapping', 'approach': 'Map source values to MDM values via reference data'}
     ]
     
-    # Save output
-    output_path = OUTPUT_DIR / STEP_WORKFLOW[0]['output']
-    with open(output_path, 'w') as f:
-        json.dump(step1_output, f, indent=2)
-    
-    # Generate markdown
-    step1_md = generate_step1_markdown(step1_output)
-    with open(OUTPUT_DIR / STEP_WORKFLOW[0]['output_md'], 'w') as f:
-        f.write(step1_md)
-    
+    # Save output (entities become dicts only here, at serialization time).
+    # When a rerun produces identical content (ignoring the extraction
+    # timestamp), skip rewriting the JSON and regenerating the markdown.
+    hash_path = CACHE_DIR / 'step1.hash'
+    step1_serializable = dict(step1_output)
+    step1_serializable['business_entities'] = [e._asdict() for e in step1_output['business_entities']]
+    new_hash = _content_hash(step1_serializable, volatile_keys=('extraction_date',))
+    if (json_path.exists() and md_path.exists() and hash_path.exists()
+            and hash_path.read_text() == new_hash):
+        print("  Output unchanged since last run; skipping rewrite")
+    else:
+        _dump_json(step1_serializable, json_path)
+        md_path.write_text(generate_step1_markdown(step1_output))
+        hash_path.write_text(new_hash)
+
     print(f"✓ Step 1 Complete: Extracted {step1_output['total_requirements']} requirements")
     print(f"  - Found {len(step1_output['business_entities'])} entities")
     print(f"  - Found {len(step1_output['source_systems'])} source systems")
     
+    # Mark in-process output so the next step's input check short-circuits
+    step1_output['_validated'] = True
     return step1_output
 
 
 def generate_step1_markdown(step1_output: Dict) -> str:
     """Generate Step 1 markdown documentation."""
-    md = f"""# Step 1: Extracted Requirements Analysis
+    parts = [f"""# Step 1: Extracted Requirements Analysis
 
 **MDM Focus:** This analysis identifies canonical master data entities for the MDM model. Source systems (Banner, Slate, etc.) are data sources that feed into these master entities, not entities themselves.
 
@@ -506,28 +735,28 @@ def generate_step1_markdown(step1_output: Dict) -> str:
 
 The following are canonical master entities that will be managed in the MDM system. Each entity represents a unified "golden record" that consolidates data from multiple source systems.
 
-"""
+"""]
     for entity in step1_output['business_entities']:
-        md += f"- **{entity['name']}** ({entity['type']}): {entity['purpose']}\n"
+        parts.append(f"- **{entity.name}** ({entity.type}): {entity.purpose}\n")
     
-    md += f"""
+    parts.append(f"""
 ## 1.2 Required Attributes and Fields
 
-"""
+""")
     # Dynamically list all entities with attributes
     for entity_name, attrs in step1_output['attributes'].items():
-        md += f"### {entity_name} Entity\n"
-        md += "**Standard Attributes:**\n"
+        parts.append(f"### {entity_name} Entity\n")
+        parts.append("**Standard Attributes:**\n")
         for attr in attrs['standard']:
-            md += f"- {attr}\n"
+            parts.append(f"- {attr}\n")
         
         if attrs['custom']:
-            md += "\n**Custom Attributes:**\n"
+            parts.append("\n**Custom Attributes:**\n")
             for attr in attrs['custom']:
-                md += f"- {attr}\n"
-        md += "\n"
+                parts.append(f"- {attr}\n")
+        parts.append("\n")
     
-    md += f"""
+    parts.append(f"""
 ## 1.3 Relationships and Hierarchies
 
 - [Entity] → Address (1-to-many)
@@ -538,32 +767,75 @@ The following are canonical master entities that will be managed in the MDM syst
 
 ## 1.4 Roles and Business Rules
 
-"""
+""")
     for role in step1_output['roles']:
-        md += f"- **{role['name']}**: {role['purpose']}\n"
+        parts.append(f"- **{role['name']}**: {role['purpose']}\n")
     
-    md += f"""
+    parts.append(f"""
 ## 1.5 Source System Integration Requirements
 
-"""
+""")
     for source in step1_output['source_systems']:
-        md += f"- **{source['name']}**: {source['connection']}\n"
+        parts.append(f"- **{source['name']}**: {source['connection']}\n")
     
-    md += f"""
+    parts.append(f"""
 ## 1.6 Matching, Merging, and Survivorship Requirements
 
-"""
+""")
     for rule in step1_output['matching_rules']:
-        md += f"- **{rule['rule']}**: {rule['criteria']}\n"
+        parts.append(f"- **{rule['rule']}**: {rule['criteria']}\n")
     
-    md += f"""
+    parts.append(f"""
 ## 1.7 Data Quality Rules
 
-"""
+""")
     for rule in step1_output['data_quality_rules']:
-        md += f"- **{rule['rule']}**: {rule['approach']}\n"
+        parts.append(f"- **{rule['rule']}**: {rule['approach']}\n")
     
-    return md
+    return ''.join(parts)
+
+
+def _collect_custom_fields(requirements: List[Entity], attrs_index: Dict,
+                           field_to_frs: Dict[str, set],
+                           cross_fields: tuple = (),
+                           exclusions: frozenset = frozenset(),
+                           custom_fallback: bool = False,
+                           into: Optional[Dict[str, set]] = None) -> Dict[str, set]:
+    """Collect FR-justified custom fields for a set of entity requirements.
+
+    Scans the Step 1 attribute index for custom fields carrying FR
+    references, then checks ``cross_fields`` (the other entity's OOTB
+    fields) against the prebuilt FR index, skipping ``exclusions``. Both
+    the Person and Organization consolidation branches run through this
+    one pure-Python hot path, so it stays small and isolable if it ever
+    warrants compilation.
+
+    Pass ``into`` to accumulate onto an existing map; otherwise a fresh
+    defaultdict(set) is returned.
+    """
+    custom_fields_with_fr = defaultdict(set) if into is None else into
+    for req in requirements:
+        attrs_data = attrs_index.get(req.name)
+        if attrs_data is None:
+            continue
+        if 'custom_with_fr' in attrs_data:
+            for field_name, fr_list in attrs_data['custom_with_fr'].items():
+                if fr_list:  # Only if FRs exist
+                    custom_fields_with_fr[field_name] = set(fr_list)
+        elif custom_fallback:
+            # Fallback: include if in custom list (backward compatibility)
+            for field_name in attrs_data.get('custom', []):
+                custom_fields_with_fr[field_name]  # creates empty set entry
+    for field in cross_fields:
+        # Only add as custom if not excluded and justified by FRs
+        if field in exclusions:
+            continue
+        mentioning_frs = field_to_frs.get(field)
+        if mentioning_frs:
+            custom_fields_with_fr[field].update(mentioning_frs)
+        else:
+            print(f"  ⚠️  Skipping {field} - no FR justification found")
+    return custom_fields_with_fr
 
 
 def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
@@ -580,24 +852,46 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
     print("\n" + "="*80)
     print("STEP 2: MAPPING TO OOTB ENTITIES (Building Canonical MDM Model)")
     print("="*80)
-    
+
+    step_cfg = STEP_WORKFLOW[1]
+    json_path = OUTPUT_DIR / step_cfg['output']
+    md_path = OUTPUT_DIR / step_cfg['output_md']
+    now_iso = datetime.now().isoformat()
+
     step2_output = {
-        'mapping_date': datetime.now().isoformat(),
+        'mapping_date': now_iso,
         'entity_mappings': [],
         'field_group_mappings': [],
         'gaps': [],
         'custom_components': []
     }
-    
+
+    # Build an inverted index from candidate OOTB field name to the FR numbers
+    # mentioning it. A single compiled alternation walks each FR text once
+    # (already lowercased by Step 1) instead of scanning every field name per
+    # FR; longer names sort first so they win over any shorter prefix.
+    candidate_fields = set(OOTB_ENTITIES['Organization']['standard_fields']) | \
+        set(OOTB_ENTITIES['Person']['standard_fields'])
+    canonical_by_lower = {field.lower(): field for field in candidate_fields}
+    field_pattern = re.compile(
+        r'(?i)\b(' + '|'.join(re.escape(f) for f in
+                              sorted(canonical_by_lower, key=len, reverse=True)) + r')\b')
+    fr_tuples = tuple((fr['fr_number'], fr['combined_text'])
+                      for fr in step1_output.get('functional_requirements', []))
+    field_to_frs: Dict[str, set] = defaultdict(set)
+    for fr_number, fr_text in fr_tuples:
+        for match in field_pattern.finditer(fr_text):
+            field_to_frs[canonical_by_lower[match.group(1)]].add(fr_number)
+
     # STEP 1: Identify all entity requirements from Step 1
     person_requirements = []
     organization_requirements = []
     other_entity_requirements = []
     
     for entity in step1_output['business_entities']:
-        entity_name = entity['name']
-        entity_type = entity['type']
-        
+        entity_name = entity.name
+        entity_type = entity.type
+
         if entity_type == 'Person':
             person_requirements.append(entity)
         elif entity_type == 'Organization':
@@ -622,93 +916,54 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
     if person_requirements or (not organization_requirements and not person_requirements):
         # Prefer Person entity (more general/flexible)
         selected_ootb_entity = 'Person'
-        all_ootb_fields = [f for f in OOTB_ENTITIES['Person']['standard_fields'] 
-                               if f not in ['SSN', 'TaxID']]
-        # Add Person custom fields WITH FR REFERENCES (only if justified by FRs)
-        custom_fields_with_fr = {}  # {field_name: [FR numbers]}
-        for req in person_requirements:
-            if req['name'] in step1_output.get('attributes', {}):
-                attrs_data = step1_output['attributes'][req['name']]
-                # Only include custom fields that have FR justification
-                if 'custom_with_fr' in attrs_data:
-                    for field_name, fr_list in attrs_data['custom_with_fr'].items():
-                        if fr_list:  # Only if FRs exist
-                            custom_fields_with_fr[field_name] = fr_list
-                else:
-                    # Fallback: include if in custom list (backward compatibility)
-                    for field_name in attrs_data.get('custom', []):
-                        if field_name not in custom_fields_with_fr:
-                            custom_fields_with_fr[field_name] = []
+        all_ootb_fields = _PERSON_OOTB_FIELDS_NO_PII
+        all_ootb_fields_set = frozenset(all_ootb_fields)
+        # Add Person custom fields WITH FR REFERENCES (only if justified by FRs).
+        # FR numbers accumulate in sets for O(1) dedup; sorted lists are
+        # materialized once below when the mapping is assembled.
+        attrs_index = step1_output.get('attributes', {})
+        custom_fields_with_fr = _collect_custom_fields(
+            person_requirements, attrs_index, field_to_frs, custom_fallback=True)
         all_requirements_consolidated.extend(person_requirements)
-        
+
         # If Organization requirements exist, check if org fields are justified by FRs
         if organization_requirements:
-            # Get FR references for organization attributes
-            for org_req in organization_requirements:
-                if org_req['name'] in step1_output.get('attributes', {}):
-                    attrs_data = step1_output['attributes'][org_req['name']]
-                    if 'custom_with_fr' in attrs_data:
-                        for field_name, fr_list in attrs_data['custom_with_fr'].items():
-                            if fr_list:  # Only if FRs exist
-                                custom_fields_with_fr[field_name] = fr_list
-                    # Also check if organization OOTB fields are mentioned in FRs
-                    org_ootb_fields = OOTB_ENTITIES['Organization']['standard_fields']
-                    for org_field in org_ootb_fields:
-                        # Only add as custom if not in Person OOTB and justified by FRs
-                        if org_field not in ['TaxID'] and org_field not in all_ootb_fields:
-                            # Check if this field is mentioned in any FR
-                            field_mentioned = False
-                            for fr in step1_output.get('functional_requirements', []):
-                                if org_field.lower() in fr['combined_text']:
-                                    field_mentioned = True
-                                    if org_field not in custom_fields_with_fr:
-                                        custom_fields_with_fr[org_field] = []
-                                    if fr['fr_number'] not in custom_fields_with_fr[org_field]:
-                                        custom_fields_with_fr[org_field].append(fr['fr_number'])
-                            # Only add if mentioned in FRs
-                            if not field_mentioned:
-                                print(f"  ⚠️  Skipping {org_field} - no FR justification found")
+            # The cross-entity OOTB field check only applies when at least one
+            # Organization requirement carries extracted attributes
+            org_has_attrs = any(r.name in attrs_index for r in organization_requirements)
+            _collect_custom_fields(
+                organization_requirements, attrs_index, field_to_frs,
+                cross_fields=OOTB_ENTITIES['Organization']['standard_fields'] if org_has_attrs else (),
+                exclusions=PERSON_ONLY_EXCLUSIONS | all_ootb_fields_set,
+                into=custom_fields_with_fr)
             all_requirements_consolidated.extend(organization_requirements)
-        
+
         all_custom_fields = list(custom_fields_with_fr.keys())
-        all_custom_fields_with_fr = custom_fields_with_fr
-    
+        all_custom_fields_with_fr = {k: sorted(v) for k, v in sorted(custom_fields_with_fr.items())}
+
     elif organization_requirements:
         # Use Organization entity
         selected_ootb_entity = 'Organization'
         all_ootb_fields = OOTB_ENTITIES['Organization']['standard_fields']
-        custom_fields_with_fr = {}
-        
+        all_ootb_fields_set = frozenset(all_ootb_fields)
+
         # Add Organization custom fields WITH FR REFERENCES
-        for req in organization_requirements:
-            if req['name'] in step1_output.get('attributes', {}):
-                attrs_data = step1_output['attributes'][req['name']]
-                if 'custom_with_fr' in attrs_data:
-                    for field_name, fr_list in attrs_data['custom_with_fr'].items():
-                        if fr_list:
-                            custom_fields_with_fr[field_name] = fr_list
+        attrs_index = step1_output.get('attributes', {})
+        custom_fields_with_fr = _collect_custom_fields(
+            organization_requirements, attrs_index, field_to_frs)
         all_requirements_consolidated.extend(organization_requirements)
-        
+
         # If Person requirements exist, check FR justification for person fields
         if person_requirements:
-            person_ootb_fields = OOTB_ENTITIES['Person']['standard_fields']
-            for person_field in person_ootb_fields:
-                if person_field not in all_ootb_fields:
-                    # Check if this field is mentioned in any FR
-                    field_mentioned = False
-                    for fr in step1_output.get('functional_requirements', []):
-                        if person_field.lower() in fr['combined_text']:
-                            field_mentioned = True
-                            if person_field not in custom_fields_with_fr:
-                                custom_fields_with_fr[person_field] = []
-                            if fr['fr_number'] not in custom_fields_with_fr[person_field]:
-                                custom_fields_with_fr[person_field].append(fr['fr_number'])
-                    if not field_mentioned:
-                        print(f"  ⚠️  Skipping {person_field} - no FR justification found")
+            _collect_custom_fields(
+                [], attrs_index, field_to_frs,
+                cross_fields=OOTB_ENTITIES['Person']['standard_fields'],
+                exclusions=all_ootb_fields_set,
+                into=custom_fields_with_fr)
             all_requirements_consolidated.extend(person_requirements)
-        
+
         all_custom_fields = list(custom_fields_with_fr.keys())
-        all_custom_fields_with_fr = custom_fields_with_fr
+        all_custom_fields_with_fr = {k: sorted(v) for k, v in sorted(custom_fields_with_fr.items())}
     else:
         all_custom_fields_with_fr = {}
         all_custom_fields = []
@@ -716,7 +971,7 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
     # STEP 3: Create single consolidated entity mapping
     if selected_ootb_entity:
         # Build justification
-        req_names = [r['name'] for r in all_requirements_consolidated]
+        req_names = [r.name for r in all_requirements_consolidated]
         justification = f"Consolidated all requirements ({', '.join(req_names)}) into single OOTB {selected_ootb_entity} entity. "
         justification += f"Using OOTB entity to minimize customization and leverage standard MDM capabilities. "
         justification += f"Additional fields added as custom attributes only where OOTB fields cannot accommodate requirements and are justified by functional requirements."
@@ -728,7 +983,7 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
             'ootb_fields_used': all_ootb_fields,
             'custom_fields_needed': all_custom_fields,
             'custom_fields_with_fr': all_custom_fields_with_fr,  # FR references for each custom field
-            'consolidated_requirements': [r['name'] for r in all_requirements_consolidated]
+            'consolidated_requirements': [r.name for r in all_requirements_consolidated]
         })
     else:
         # LAST RESORT: Only if no OOTB entity can work, create custom entity
@@ -738,51 +993,53 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
             'type': 'CustomEntity',
             'name': 'CustomMDMEntity',
             'justification': 'No OOTB entity could accommodate all requirements. Custom entity created as last resort.',
-            'fields': all_ootb_fields + all_custom_fields
+            'fields': [*all_ootb_fields, *all_custom_fields]
             })
     
     # Map field groups from Step 1 entities (those with type 'FieldGroup')
     for entity in step1_output['business_entities']:
-        if entity['type'] == 'FieldGroup':
-            fg_name = entity['name']
+        if entity.type == 'FieldGroup':
+            fg_name = entity.name
             # Check if it's an OOTB field group
             if fg_name in OOTB_FIELD_GROUPS:
                 step2_output['field_group_mappings'].append({
                     'requirement': f'{fg_name} field group',
                     'ootb_field_group': fg_name,
-                    'justification': entity['purpose'],
+                    'justification': entity.purpose,
                     'ootb_fields_used': OOTB_FIELD_GROUPS[fg_name]['standard_fields'],
                     'custom_fields_needed': ['SourceSystemKey']  # Always need this for source tracking
                 })
         
-        elif entity['type'] == 'CustomFieldGroup':
+        elif entity.type == 'CustomFieldGroup':
             # Custom field groups
-            fg_name = entity['name']
+            fg_name = entity.name
             # Infer fields based on field group name
-            fields = []
-            if fg_name.lower() == 'role':
-                fields = ['RoleType', 'RoleStatus', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey']
-            elif 'relationship' in fg_name.lower():
-                fields = ['RelatedConstituentId', 'RelationshipType', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey']
+            fg_name_lower = fg_name.lower()
+            if fg_name_lower == 'role':
+                fields = ROLE_FG_FIELDS
+            elif 'relationship' in fg_name_lower:
+                fields = RELATIONSHIP_FG_FIELDS
             else:
-                fields = ['Type', 'Status', 'StartDate', 'EndDate', 'SourceSystem', 'SourceSystemKey']
+                fields = GENERIC_FG_FIELDS
             
             step2_output['custom_components'].append({
                 'type': 'CustomFieldGroup',
                 'name': fg_name,
-                'justification': entity['purpose'],
+                'justification': entity.purpose,
                 'fields': fields
             })
     
-    # Save output
-    output_path = OUTPUT_DIR / STEP_WORKFLOW[1]['output']
-    with open(output_path, 'w') as f:
-        json.dump(step2_output, f, indent=2)
-    
-    # Generate markdown
-    step2_md = generate_step2_markdown(step2_output)
-    with open(OUTPUT_DIR / STEP_WORKFLOW[1]['output_md'], 'w') as f:
-        f.write(step2_md)
+    # Save output. When a rerun produces identical content (ignoring the
+    # mapping timestamp), skip rewriting the JSON and regenerating the markdown.
+    hash_path = CACHE_DIR / 'step2.hash'
+    new_hash = _content_hash(step2_output, volatile_keys=('mapping_date',))
+    if (json_path.exists() and md_path.exists() and hash_path.exists()
+            and hash_path.read_text() == new_hash):
+        print("  Output unchanged since last run; skipping rewrite")
+    else:
+        _dump_json(step2_output, json_path)
+        md_path.write_text(generate_step2_markdown(step2_output))
+        hash_path.write_text(new_hash)
     
     print("✓ Step 2 Complete: Mapped to OOTB entities")
     if step2_output['entity_mappings']:
@@ -793,12 +1050,14 @@ def step2_map_ootb_entities(step1_output: Dict) -> Dict[str, Any]:
     print(f"  - Mapped {len(step2_output['field_group_mappings'])} field groups to OOTB")
     print(f"  - Identified {len(step2_output['custom_components'])} custom components needed")
     
+    # Mark in-process output so the next step's input check short-circuits
+    step2_output['_validated'] = True
     return step2_output
 
 
 def generate_step2_markdown(step2_output: Dict) -> str:
     """Generate Step 2 markdown documentation."""
-    md = """# Step 2: Mapping to OOTB Entities and Identifying Gaps
+    parts = ["""# Step 2: Mapping to OOTB Entities and Identifying Gaps
 
 **MDM Focus:** This mapping creates the canonical MDM model structure using OOTB entities. The model represents the unified master data structure, not source-specific schemas. All source systems feed into these canonical entities.
 
@@ -806,55 +1065,55 @@ def generate_step2_markdown(step2_output: Dict) -> str:
 
 The following mappings define the canonical MDM entities that will serve as the "golden record" for master data:
 
-"""
+"""]
     for mapping in step2_output['entity_mappings']:
         req_name = mapping.get('requirement', 'Unified MDM Entity')
-        md += f"""### {req_name}
+        parts.append(f"""### {req_name}
 
 - **OOTB Entity:** {mapping['ootb_entity']}
-- **Justification:** {mapping['justification']}"""
+- **Justification:** {mapping['justification']}""")
         
         if mapping.get('consolidated_requirements'):
-            md += f"\n- **Consolidated Requirements:** {', '.join(mapping['consolidated_requirements'])}"
+            parts.append(f"\n- **Consolidated Requirements:** {', '.join(mapping['consolidated_requirements'])}")
         
         # Add FR references for custom fields
         custom_fields_with_fr = mapping.get('custom_fields_with_fr', {})
         if custom_fields_with_fr:
-            md += f"\n- **Custom Fields with FR References:**"
-            for field_name, fr_list in sorted(custom_fields_with_fr.items()):
-                md += f"\n  - {field_name}: {', '.join(fr_list)}"
+            parts.append(f"\n- **Custom Fields with FR References:**")
+            for field_name, fr_list in custom_fields_with_fr.items():
+                parts.append(f"\n  - {field_name}: {', '.join(fr_list)}")
         
-        md += f"""
+        parts.append(f"""
 - **OOTB Fields Used:** {', '.join(mapping['ootb_fields_used'])}
 - **Custom Fields Needed:** {', '.join(mapping['custom_fields_needed']) if mapping['custom_fields_needed'] else 'None'}
 
-"""
+""")
     
-    md += """## 2.2 Field Group Mappings
+    parts.append("""## 2.2 Field Group Mappings
 
-"""
+""")
     for mapping in step2_output['field_group_mappings']:
-        md += f"""### {mapping['requirement']}
+        parts.append(f"""### {mapping['requirement']}
 
 - **OOTB Field Group:** {mapping['ootb_field_group']}
 - **Justification:** {mapping['justification']}
 - **OOTB Fields Used:** {', '.join(mapping['ootb_fields_used'])}
 - **Custom Fields Needed:** {', '.join(mapping['custom_fields_needed'])}
 
-"""
+""")
     
-    md += """## 2.3 Custom Components Required
+    parts.append("""## 2.3 Custom Components Required
 
-"""
+""")
     for comp in step2_output['custom_components']:
-        md += f"""### {comp['name']} ({comp['type']})
+        parts.append(f"""### {comp['name']} ({comp['type']})
 
 - **Justification:** {comp['justification']}
 - **Fields:** {', '.join(comp['fields'])}
 
-"""
+""")
     
-    md += """## 2.4 Mapping Summary
+    parts.append("""## 2.4 Mapping Summary
 
 - **OOTB Entities Used:** [List OOTB entities used in your mappings, e.g., Person, Organization, Product]
 - **OOTB Field Groups Used:** [List OOTB field groups leveraged, e.g., Address, Phone, Email]
@@ -862,8 +1121,8 @@ The following mappings define the canonical MDM entities that will serve as the
 - **Custom Attributes on OOTB Entities:** [List custom attributes added to OOTB entities, if any]
 - **Custom Fields in OOTB Field Groups:** [List custom fields added to OOTB field groups, if any]
 
-"""
-    return md
+""")
+    return ''.join(parts)
 
 
 def step3_design_data_model(step2_output: Dict) -> Dict[str, Any]:
@@ -879,14 +1138,18 @@ def step3_design_data_model(step2_output: Dict) -> Dict[str, Any]:
     print("\n" + "="*80)
     print("STEP 3: DESIGNING CANONICAL MDM DATA MODEL")
     print("="*80)
-    
+
+    step_cfg = STEP_WORKFLOW[2]
+    json_path = OUTPUT_DIR / step_cfg['output']
+    md_path = OUTPUT_DIR / step_cfg['output_md']
+    now_iso = datetime.now().isoformat()
+
     # Get Step 1 output to extract entities and attributes
     step1_path = OUTPUT_DIR / STEP_WORKFLOW[0]['output']
-    with open(step1_path, 'r') as f:
-        step1_output = json.load(f)
-    
+    step1_output = json.loads(step1_path.read_bytes())
+
     step3_output = {
-        'model_date': datetime.now().isoformat(),
+        'model_date': now_iso,
         'entities': []
     }
     
@@ -922,6 +1185,7 @@ def step3_design_data_model(step2_output: Dict) -> Dict[str, Any]:
     
     entity_data = {
         'name': ootb_entity_name,  # Use canonical OOTB entity name
+        'name_lower': ootb_entity_name.lower(),  # Precomputed for diagram filenames
         'original_name': entity_name,  # Keep original name for reference
         'type': 'OOTB',
         'purpose': purpose,
@@ -934,70 +1198,75 @@ def step3_design_data_model(step2_output: Dict) -> Dict[str, Any]:
         'field_groups': []
     }
     
-    # Add field groups from Step 2 mappings (avoid duplicates)
-    fg_names_added = set()
+    # Build field groups in a dict keyed by name: duplicates are an O(1)
+    # membership check and first occurrence wins. Flattened to a list once
+    # the construction is complete.
+    fg_by_name: Dict[str, Dict] = {}
     for fg_mapping in step2_output['field_group_mappings']:
         fg_name = fg_mapping['ootb_field_group']
-        if fg_name not in fg_names_added:
-            entity_data['field_groups'].append({
+        if fg_name not in fg_by_name:
+            fg_by_name[fg_name] = {
                 'name': fg_name,
                 'type': 'OOTB',
                 'fields': {
                     'ootb': fg_mapping['ootb_fields_used'],
                     'custom': fg_mapping['custom_fields_needed']
                 }
-            })
-            fg_names_added.add(fg_name)
-    
+            }
+
     # Add Identifier field group (standard for Person/Organization) if not already added
-    if 'Identifier' not in fg_names_added:
-        entity_data['field_groups'].append({
+    if 'Identifier' not in fg_by_name:
+        fg_by_name['Identifier'] = {
             'name': 'Identifier',
             'type': 'OOTB',
             'fields': {
                 'ootb': OOTB_FIELD_GROUPS['Identifier']['standard_fields'],
                 'custom': ['SourceSystemKey']  # MDM: Always track source system for data lineage
             }
-        })
-        fg_names_added.add('Identifier')
-    
-    # Add custom field groups from Step 2
+        }
+
+    # Add custom field groups from Step 2 (skipping any already added)
     for custom_comp in step2_output['custom_components']:
-        if custom_comp['type'] == 'CustomFieldGroup':
-            # Check if this field group is already added (avoid duplicates)
-            if not any(fg['name'] == custom_comp['name'] for fg in entity_data['field_groups']):
-                entity_data['field_groups'].append({
-                    'name': custom_comp['name'],
-                    'type': 'Custom',
-                    'fields': {
-                        'custom': custom_comp['fields']
-                    }
-                })
+        if custom_comp['type'] == 'CustomFieldGroup' and custom_comp['name'] not in fg_by_name:
+            fg_by_name[custom_comp['name']] = {
+                'name': custom_comp['name'],
+                'type': 'Custom',
+                'fields': {
+                    'custom': custom_comp['fields']
+                }
+            }
+
+    entity_data['field_groups'] = list(fg_by_name.values())
     
     # Add the single consolidated entity
     step3_output['entities'].append(entity_data)
     
-    # Save output
-    output_path = OUTPUT_DIR / STEP_WORKFLOW[2]['output']
-    with open(output_path, 'w') as f:
-        json.dump(step3_output, f, indent=2)
-    
-    # Generate markdown (pass Step 1 output for source systems info)
-    step3_md = generate_step3_markdown(step3_output['entities'], step1_output)
-    with open(OUTPUT_DIR / STEP_WORKFLOW[2]['output_md'], 'w') as f:
-        f.write(step3_md)
+    # Save output. When a rerun produces identical content (ignoring the
+    # model timestamp), skip rewriting the JSON and regenerating the markdown.
+    hash_path = CACHE_DIR / 'step3.hash'
+    new_hash = _content_hash(step3_output, volatile_keys=('model_date',))
+    if (json_path.exists() and md_path.exists() and hash_path.exists()
+            and hash_path.read_text() == new_hash):
+        print("  Output unchanged since last run; skipping rewrite")
+    else:
+        _dump_json(step3_output, json_path)
+        # Markdown includes Step 1 source systems info
+        md_path.write_text(generate_step3_markdown(step3_output['entities'], step1_output))
+        hash_path.write_text(new_hash)
     
     print("✓ Step 3 Complete: Data model designed")
     print(f"  - Designed {len(step3_output['entities'])} entity/entities")
     total_fgs = sum(len(e['field_groups']) for e in step3_output['entities'])
     print(f"  - Configured {total_fgs} total field groups")
     
+    # Mark in-process output so the next step's input check short-circuits
+    step3_output['_validated'] = True
     return step3_output
 
 
 def generate_step3_markdown(entities: List[Dict], step1_output: Optional[Dict] = None) -> str:
     """Generate Step 3 markdown documentation."""
-    md = """# Step 3: Hierarchical Data Model Design
+    parts = ["""# Step 3: Hierarchical Data Model Design
 
 **MDM Focus:** This is the canonical MDM hierarchical data model. It represents the unified master data structure that consolidates information from all source systems. Each entity serves as the "golden record" with source system tracking via SourceSystemKey fields.
 
@@ -1007,100 +1276,100 @@ def generate_step3_markdown(entities: List[Dict], step1_output: Optional[Dict] =
 - **Source Lineage:** SourceSystemKey tracks data origin for data quality and governance
 - **Master Data Only:** Focus on identity, relationships, and core attributes (excludes transactional data)
 
-"""
+"""]
     
     for entity in entities:
         original_name = entity.get('original_name', entity['name'])
-        md += f"""## 3.1 Entity: {entity['name']} ({original_name})
+        parts.append(f"""## 3.1 Entity: {entity['name']} ({original_name})
 
 **Type:** OOTB Entity (Extended)
 **Purpose:** {entity['purpose']}
 
 ### Identifiers
-"""
+""")
         for ident in entity['identifiers']:
             if 'Id' in ident and ident.endswith('Id'):
-                md += f"- {ident} (MDM generated)\n"
+                parts.append(f"- {ident} (MDM generated)\n")
             else:
-                md += f"- {ident}\n"
+                parts.append(f"- {ident}\n")
         
-        md += """
+        parts.append("""
 ### Attributes
 
 **OOTB Attributes:**
-"""
+""")
         for attr in entity['attributes']['ootb']:
-            md += f"- {attr}\n"
+            parts.append(f"- {attr}\n")
         
         if entity['attributes']['custom']:
-            md += "\n**Custom Attributes:**\n"
+            parts.append("\n**Custom Attributes:**\n")
             for attr in entity['attributes']['custom']:
-                md += f"- {attr}\n"
+                parts.append(f"- {attr}\n")
         
-        md += "\n### Field Groups\n\n"
+        parts.append("\n### Field Groups\n\n")
         for fg in entity['field_groups']:
-            md += f"#### {fg['name']} ({fg['type']}"
+            parts.append(f"#### {fg['name']} ({fg['type']}")
             if fg['fields'].get('custom'):
-                md += " - Extended"
-            md += ")\n"
+                parts.append(" - Extended")
+            parts.append(")\n")
             
             if fg['fields'].get('ootb'):
-                md += "**OOTB Fields:**\n"
+                parts.append("**OOTB Fields:**\n")
                 for field in fg['fields']['ootb']:
-                    md += f"- {field}\n"
+                    parts.append(f"- {field}\n")
             
             if fg['fields'].get('custom'):
-                md += "\n**Custom Fields:**\n"
+                parts.append("\n**Custom Fields:**\n")
                 for field in fg['fields']['custom']:
                     if field == 'SourceSystemKey':
-                        md += f"- {field} (for unique identification from source systems)\n"
+                        parts.append(f"- {field} (for unique identification from source systems)\n")
                     elif field == 'RoleType':
-                        md += f"- {field} (dropdown: Student, Faculty, Staff, Alumni, Donor, Prospect)\n"
+                        parts.append(f"- {field} (dropdown: Student, Faculty, Staff, Alumni, Donor, Prospect)\n")
                     else:
-                        md += f"- {field}\n"
+                        parts.append(f"- {field}\n")
             
-            md += "\n"
+            parts.append("\n")
     
     
     # Use Step 1 output for source systems if provided
     if step1_output and isinstance(step1_output, dict) and 'source_systems' in step1_output:
-        md += """## 3.2 Source System Integration
+        parts.append("""## 3.2 Source System Integration
 
 ### Source Systems
-"""
+""")
         for source in step1_output['source_systems']:
-            md += f"- **{source['name']}** ({source.get('connection', 'API')}) → Entity and field groups\n"
+            parts.append(f"- **{source['name']}** ({source.get('connection', 'API')}) → Entity and field groups\n")
         
-        md += """
+        parts.append("""
 ### Cross-Reference Tracking
 - All source systems track cross-references using SourceSystemKey in field groups
 - Entities track cross-references using Identifier field group
 
 ## 3.3 Matching and Survivorship
 
-"""
+""")
         if 'matching_rules' in step1_output:
             for rule in step1_output['matching_rules']:
-                md += f"- **{rule['rule']}:** {rule['criteria'][:100]}...\n"
+                parts.append(f"- **{rule['rule']}:** {rule['criteria'][:100]}...\n")
         else:
-            md += "- **Matching:** Based on identifiers and key attributes\n"
+            parts.append("- **Matching:** Based on identifiers and key attributes\n")
         
-        md += """
+        parts.append("""
 - **Survivorship:** Configured at attribute level with source priority rules
 - **Unique Identification:** SourceSystemKey used to prevent duplicate records
 
 ## 3.4 Data Quality Rules
 
-"""
+""")
         if 'data_quality_rules' in step1_output:
             for rule in step1_output['data_quality_rules']:
-                md += f"- **{rule['rule']}:** {rule['approach'][:100]}...\n"
+                parts.append(f"- **{rule['rule']}:** {rule['approach'][:100]}...\n")
         else:
-            md += "- Data quality rules as specified in requirements\n"
+            parts.append("- Data quality rules as specified in requirements\n")
         
-        md += "\n"
+        parts.append("\n")
     else:
-        md += """## 3.2 Source System Integration
+        parts.append("""## 3.2 Source System Integration
 (Source system information from Step 1)
 
 ## 3.3 Matching and Survivorship
@@ -1109,9 +1378,9 @@ def generate_step3_markdown(entities: List[Dict], step1_output: Optional[Dict] =
 ## 3.4 Data Quality Rules
 (Data quality rules from Step 1)
 
-"""
+""")
     
-    return md
+    return ''.join(parts)
 
 
 def step4_create_diagrams(step3_output: Dict) -> Dict[str, Any]:
@@ -1123,49 +1392,159 @@ def step4_create_diagrams(step3_output: Dict) -> Dict[str, Any]:
     diagrams_created = []
     diagram_dir = OUTPUT_DIR / STEP_WORKFLOW[3]['output']
     diagram_dir.mkdir(exist_ok=True)
-    
-    for entity in step3_output['entities']:
-        svg_path = diagram_dir / f"step4_{entity['name'].lower()}_entity_hierarchy.svg"
-        create_svg_diagram(entity, svg_path)
+
+    entities = step3_output['entities']
+    # Rendering is pure CPU work per entity, so multi-entity models fan out
+    # across cores; a single entity is not worth the process spin-up.
+    if len(entities) > 1:
+        with ProcessPoolExecutor() as executor:
+            rendered = list(executor.map(render_entity_svg, entities))
+    else:
+        rendered = [render_entity_svg(entity) for entity in entities]
+
+    for entity, svg_content in zip(entities, rendered):
+        svg_name = f"step4_{entity['name_lower']}_entity_hierarchy.svg"
+        if SVG_COMPRESS:
+            svg_path = diagram_dir / (svg_name + 'z')
+            with gzip.open(svg_path, 'wt', compresslevel=1) as f:
+                f.write(svg_content)
+        else:
+            svg_path = diagram_dir / svg_name
+            svg_path.write_text(svg_content)
         diagrams_created.append(str(svg_path))
         print(f"  ✓ Created: {svg_path.name}")
     
     print(f"\n✓ Step 4 Complete: Created {len(diagrams_created)} diagram(s)")
     
-    return {'diagrams_created': diagrams_created}
+    return {'diagrams_created': diagrams_created, '_validated': True}
+
 
+# Fields that have dropdown/selectable values
+DROPDOWN_FIELDS = frozenset({
+    'Gender', 'MaritalStatus', 'AddressType', 'PhoneType', 'EmailType',
+    'IdentifierType', 'Status', 'Type', 'PrimaryFlag', 'DoNotCallFlag',
+    'DoNotEmailFlag', 'BounceFlag', 'VerificationStatus', 'OrganizationType',
+    'Roletype', 'Relationshiptype', 'Employmentstatus', 'Classification',
+    'PreferredLanguage', 'DeceasedFlag'
+})
 
-def create_svg_diagram(entity_data: Dict, output_path: Path) -> None:
-    """Create SVG hierarchy diagram for an entity with proper tree structure."""
+# SVG templates precompiled once at import time: the legend/header block and the
+# per-item rect/text pairs are structurally identical for every entity, so only
+# the varying coordinates and labels are substituted per call.
+_SVG_HEADER_TMPL = string.Template("""<?xml version="1.0" encoding="UTF-8"?>
+<svg width="${svg_width}" height="${svg_height}" xmlns="http://www.w3.org/2000/svg">
+  <!-- Title -->
+  <text x="10" y="20" font-family="Arial" font-size="14" font-weight="bold" text-decoration="underline">
+    ${entity_name} Entity Hierarchy
+  </text>
+
+  <!-- Legend -->
+  <rect x="10" y="30" width="780" height="40" fill="#f0f0f0" stroke="#666" stroke-width="1" rx="5"/>
+  <text x="20" y="50" font-family="Arial" font-size="11" font-weight="bold">Legend:</text>
+  <rect x="100" y="40" width="100" height="20" fill="#2196F3" stroke="#666" rx="3"/>
+  <text x="105" y="53" font-family="Arial" font-size="9">Business Entity</text>
+  <rect x="220" y="40" width="100" height="20" fill="#C5E1A5" stroke="#666" rx="3"/>
+  <text x="225" y="53" font-family="Arial" font-size="9">General Attributes</text>
+  <rect x="340" y="40" width="100" height="20" fill="#F8BBD9" stroke="#666" rx="3"/>
+  <text x="345" y="53" font-family="Arial" font-size="9">Identifiers</text>
+  <rect x="460" y="40" width="100" height="20" fill="#FFD54F" stroke="#666" rx="3"/>
+  <text x="465" y="53" font-family="Arial" font-size="9">Field Groups</text>
+
+  <defs>
+    <rect id="box-pink" width="${box_width}" height="${box_height}" fill="#F8BBD9" stroke="#666" stroke-width="1" rx="12"/>
+    <rect id="box-green" width="${box_width}" height="${box_height}" fill="#C5E1A5" stroke="#666" stroke-width="1" rx="12"/>
+    <rect id="box-yellow" width="${box_width}" height="${box_height}" fill="#FFD54F" stroke="#666" stroke-width="1" rx="12"/>
+  </defs>
+
+  <!-- Main Entity Box (Blue) -->
+  <rect x="${entity_x}" y="${entity_y}" width="${box_width}" height="${box_height}" fill="#2196F3" stroke="#666" stroke-width="1" rx="12"/>
+  <text x="${trunk_x}" y="${entity_label_y}" font-family="Arial" font-size="11" fill="white" text-anchor="middle" font-weight="bold">${entity_name}</text>
+
+  <!-- Vertical trunk line from entity -->""")
+
+_IDENT_TMPL = string.Template(
+    '  <use href="#box-pink" x="${x}" y="${y}"/>\n'
+    '  <text x="${cx}" y="${label_y}" font-family="Arial" font-size="10" text-anchor="middle">${name}</text>\n'
+)
+
+_ATTR_TMPL = string.Template(
+    '  <use href="#box-green" x="${x}" y="${y}"/>\n'
+    '  <text x="${cx}" y="${label_y}" font-family="Arial" font-size="10" text-anchor="middle">${name}</text>\n'
+)
+
+_FG_TMPL = string.Template(
+    '  <use href="#box-yellow" x="${x}" y="${y}"/>\n'
+    '  <text x="${cx}" y="${label_y}" font-family="Arial" font-size="10" text-anchor="middle">${name}</text>\n'
+)
+
+# %-style templates for the high-volume fragments. Connector lines live in an
+# enclosing <g> that supplies the shared stroke attributes, so each child
+# carries geometry only; SUBLINES_TMPL covers the three-segment path from a
+# field group to one of its sub-fields.
+LINE_TMPL = '    <line x1="%d" y1="%d" x2="%d" y2="%d"/>\n'
+SUBLINES_TMPL = (
+    '    <line x1="%d" y1="%d" x2="%d" y2="%d"/>\n'
+    '    <line x1="%d" y1="%d" x2="%d" y2="%d"/>\n'
+    '    <line x1="%d" y1="%d" x2="%d" y2="%d"/>\n'
+)
+DROPDOWN_TMPL = '  <text x="%d" y="%d" font-family="Arial" font-size="%d" fill="#666">▼</text>\n'
+SUBFIELD_TMPL = (
+    '  <use href="#box-green" x="%d" y="%d"/>\n'
+    '  <text x="%d" y="%d" font-family="Arial" font-size="9" text-anchor="middle">%s</text>\n'
+)
+_G_OPEN = '\n  <g stroke="#666" stroke-width="1">\n'
+_G_CLOSE = '  </g>\n'
+
+# Pretty-print SVG fragments (two-space indent, one element per line). Turn
+# off to emit the most compact document the renderers will still accept.
+PRETTY = True
+
+
+def _compact_svg(fragment: str) -> str:
+    """Strip indentation and newlines from an SVG template fragment."""
+    return ''.join(line.lstrip() for line in fragment.splitlines())
+
+
+if not PRETTY:
+    _SVG_HEADER_TMPL = string.Template(_compact_svg(_SVG_HEADER_TMPL.template))
+    _IDENT_TMPL = string.Template(_compact_svg(_IDENT_TMPL.template))
+    _ATTR_TMPL = string.Template(_compact_svg(_ATTR_TMPL.template))
+    _FG_TMPL = string.Template(_compact_svg(_FG_TMPL.template))
+    LINE_TMPL = _compact_svg(LINE_TMPL)
+    SUBLINES_TMPL = _compact_svg(SUBLINES_TMPL)
+    DROPDOWN_TMPL = _compact_svg(DROPDOWN_TMPL)
+    SUBFIELD_TMPL = _compact_svg(SUBFIELD_TMPL)
+    _G_OPEN = _compact_svg(_G_OPEN)
+    _G_CLOSE = _compact_svg(_G_CLOSE)
+
+
+def render_entity_svg(entity_data: Dict) -> str:
+    """Render the SVG hierarchy diagram for an entity with proper tree structure.
+
+    Returns the document as a string so rendering can run in worker
+    processes; the orchestrator owns the file writes.
+    """
     entity_name = entity_data['name']
     identifiers = entity_data.get('identifiers', [])
     attributes_ootb = entity_data['attributes'].get('ootb', [])
     attributes_custom = entity_data['attributes'].get('custom', [])
     field_groups = entity_data.get('field_groups', [])
-    
-    # Fields that have dropdown/selectable values
-    dropdown_fields = {
-        'Gender', 'MaritalStatus', 'AddressType', 'PhoneType', 'EmailType', 
-        'IdentifierType', 'Status', 'Type', 'PrimaryFlag', 'DoNotCallFlag',
-        'DoNotEmailFlag', 'BounceFlag', 'VerificationStatus', 'OrganizationType',
-        'Roletype', 'Relationshiptype', 'Employmentstatus', 'Classification',
-        'PreferredLanguage', 'DeceasedFlag'
-    }
-    
+
     # Layout constants
     box_width = 145
     box_height = 26
     spacing = 29
     entity_x = 20
     entity_y = 80
-    trunk_x = entity_x + box_width / 2  # Center of entity box
+    trunk_x = entity_x + box_width // 2  # Center of entity box
     col1_x = 220  # Column 1: Identifiers, Attributes, Field Groups
     col2_x = 380  # Column 2: Sub-attributes of field groups
     
-    # Calculate positions for all items
+    # Calculate positions for all items, tracking the extent as we go
     items = []
     current_y = entity_y + box_height + spacing
-    
+    max_y = entity_y + box_height
+
     # Add identifiers
     for identifier in identifiers:
         items.append({
@@ -1174,16 +1553,18 @@ def create_svg_diagram(entity_data: Dict, output_path: Path) -> None:
             'y': current_y,
             'has_dropdown': False
         })
+        max_y = current_y
         current_y += spacing
-    
+
     # Add OOTB attributes
     for attr in attributes_ootb:
         items.append({
             'type': 'attribute',
             'name': attr,
             'y': current_y,
-            'has_dropdown': attr in dropdown_fields
+            'has_dropdown': attr in DROPDOWN_FIELDS
         })
+        max_y = current_y
         current_y += spacing
     
     # Add custom attributes
@@ -1192,9 +1573,10 @@ def create_svg_diagram(entity_data: Dict, output_path: Path) -> None:
             'type': 'attribute',
             'name': attr,
             'y': current_y,
-            'has_dropdown': attr in dropdown_fields,
+            'has_dropdown': attr in DROPDOWN_FIELDS,
             'is_custom': True
         })
+        max_y = current_y
         current_y += spacing
     
     # Add field groups with their sub-fields
@@ -1203,7 +1585,7 @@ def create_svg_diagram(entity_data: Dict, output_path: Path) -> None:
         fg_type = fg.get('type', 'Custom')
         fg_ootb_fields = fg['fields'].get('ootb', [])
         fg_custom_fields = fg['fields'].get('custom', [])
-        all_fg_fields = fg_ootb_fields + fg_custom_fields
+        all_fg_fields = [*fg_ootb_fields, *fg_custom_fields]
         
         items.append({
             'type': 'field_group',
@@ -1213,118 +1595,99 @@ def create_svg_diagram(entity_data: Dict, output_path: Path) -> None:
             'sub_fields': all_fg_fields,
             'has_dropdown': False
         })
+        max_y = max(max_y, current_y + len(all_fg_fields) * spacing)
         current_y += spacing
-    
-    # Calculate total height needed
-    max_y = max([item['y'] for item in items]) if items else entity_y
-    # Add space for field group sub-attributes
-    for item in items:
-        if item['type'] == 'field_group' and item['sub_fields']:
-            max_y = max(max_y, item['y'] + len(item['sub_fields']) * spacing)
-    
+
     svg_height = max(max_y + 100, 200)
     svg_width = 900  # Max width as specified
     
-    # Build SVG
-    svg_parts = [f"""<?xml version="1.0" encoding="UTF-8"?>
-<svg width="{svg_width}" height="{svg_height}" xmlns="http://www.w3.org/2000/svg">
-  <!-- Title -->
-  <text x="10" y="20" font-family="Arial" font-size="14" font-weight="bold" text-decoration="underline">
-    {entity_name} Entity Hierarchy
-  </text>
-  
-  <!-- Legend -->
-  <rect x="10" y="30" width="780" height="40" fill="#f0f0f0" stroke="#666" stroke-width="1" rx="5"/>
-  <text x="20" y="50" font-family="Arial" font-size="11" font-weight="bold">Legend:</text>
-  <rect x="100" y="40" width="100" height="20" fill="#2196F3" stroke="#666" rx="3"/>
-  <text x="105" y="53" font-family="Arial" font-size="9">Business Entity</text>
-  <rect x="220" y="40" width="100" height="20" fill="#C5E1A5" stroke="#666" rx="3"/>
-  <text x="225" y="53" font-family="Arial" font-size="9">General Attributes</text>
-  <rect x="340" y="40" width="100" height="20" fill="#F8BBD9" stroke="#666" rx="3"/>
-  <text x="345" y="53" font-family="Arial" font-size="9">Identifiers</text>
-  <rect x="460" y="40" width="100" height="20" fill="#FFD54F" stroke="#666" rx="3"/>
-  <text x="465" y="53" font-family="Arial" font-size="9">Field Groups</text>
-  
-  <!-- Main Entity Box (Blue) -->
-  <rect x="{entity_x}" y="{entity_y}" width="{box_width}" height="{box_height}" fill="#2196F3" stroke="#666" stroke-width="1" rx="12"/>
-  <text x="{trunk_x}" y="{entity_y + 18}" font-family="Arial" font-size="11" fill="white" text-anchor="middle" font-weight="bold">{entity_name}</text>
-  
-  <!-- Vertical trunk line from entity -->"""
-    ]
-    
-    # Calculate trunk end position
+    # Build SVG into a single growable buffer
+    buf = io.StringIO()
+    buf.write(_SVG_HEADER_TMPL.substitute(
+        entity_name=entity_name, svg_width=svg_width, svg_height=svg_height,
+        entity_x=entity_x, entity_y=entity_y, box_width=box_width,
+        box_height=box_height, trunk_x=trunk_x, entity_label_y=entity_y + 18,
+    ))
+
+    # Bind hot names to locals before the loops — the portable slice
+    # of what statically compiling this loop would buy (no global or
+    # bound-method lookups per fragment)
+    write = buf.write
+    line_tmpl = LINE_TMPL
+    sublines_tmpl = SUBLINES_TMPL
+    subfield_tmpl = SUBFIELD_TMPL
+    dropdown_tmpl = DROPDOWN_TMPL
+    dropdown_fields = DROPDOWN_FIELDS
+    item_center_x = col1_x + box_width // 2
+    sub_center_x = col2_x + box_width // 2
+    fg_right_x = col1_x + box_width
+    # Small gap before branching to sub-fields
+    branch_x = fg_right_x + 10
+
+    # First pass: all connector lines, grouped so the shared stroke
+    # attributes are emitted once
     trunk_end_y = max([item['y'] for item in items]) if items else entity_y + box_height
-    svg_parts.append(f'  <line x1="{trunk_x}" y1="{entity_y + box_height}" x2="{trunk_x}" y2="{trunk_end_y + box_height/2}" stroke="#666" stroke-width="1"/>\n')
-    
-    # Draw all items
+    write(_G_OPEN)
+    write(line_tmpl % (trunk_x, entity_y + box_height, trunk_x, trunk_end_y + box_height // 2))
     for item in items:
-        item_center_x = col1_x + box_width / 2
         item_y = item['y']
-        item_center_y = item_y + box_height / 2
-        
+        item_center_y = item_y + box_height // 2
         # Horizontal branch line from trunk to item
-        svg_parts.append(f'  <line x1="{trunk_x}" y1="{item_center_y}" x2="{col1_x}" y2="{item_center_y}" stroke="#666" stroke-width="1"/>\n')
-        
+        write(line_tmpl % (trunk_x, item_center_y, col1_x, item_center_y))
+        if item['type'] == 'field_group' and item['sub_fields']:
+            fg_center_y = item_center_y
+            # Per-subfield Y positions computed in one vectorized step,
+            # kept on the item for the box-drawing pass
+            sub_ys = (item_y + np.arange(len(item['sub_fields'])) * spacing).tolist()
+            item['sub_ys'] = sub_ys
+            for sub_y in sub_ys:
+                sub_center_y = sub_y + box_height // 2
+                # Field group -> branch point -> sub-field
+                write(sublines_tmpl % (
+                    fg_right_x, fg_center_y, branch_x, fg_center_y,
+                    branch_x, fg_center_y, branch_x, sub_center_y,
+                    branch_x, sub_center_y, col2_x, sub_center_y))
+    write(_G_CLOSE)
+
+    # Second pass: boxes and labels drawn over the connectors
+    for item in items:
+        item_y = item['y']
+
         if item['type'] == 'identifier':
             # Pink box for identifiers
-            svg_parts.append(f'  <rect x="{col1_x}" y="{item_y}" width="{box_width}" height="{box_height}" fill="#F8BBD9" stroke="#666" stroke-width="1" rx="12"/>\n')
-            svg_parts.append(f'  <text x="{item_center_x}" y="{item_y + 18}" font-family="Arial" font-size="10" text-anchor="middle">{item["name"]}</text>\n')
-        
+            write(_IDENT_TMPL.substitute(
+                x=col1_x, y=item_y, cx=item_center_x,
+                label_y=item_y + 18, name=item['name']))
+
         elif item['type'] == 'attribute':
             # Green box for attributes
             display_name = item['name']
             if item.get('is_custom'):
                 display_name += ' (custom)'
-            svg_parts.append(f'  <rect x="{col1_x}" y="{item_y}" width="{box_width}" height="{box_height}" fill="#C5E1A5" stroke="#666" stroke-width="1" rx="12"/>\n')
-            text_x = item_center_x
+            write(_ATTR_TMPL.substitute(
+                x=col1_x, y=item_y, cx=item_center_x,
+                label_y=item_y + 18, name=display_name))
             if item['has_dropdown']:
                 # Add dropdown indicator
-                svg_parts.append(f'  <text x="{text_x}" y="{item_y + 18}" font-family="Arial" font-size="10" text-anchor="middle">{display_name}</text>\n')
-                svg_parts.append(f'  <text x="{col1_x + box_width - 15}" y="{item_y + 12}" font-family="Arial" font-size="8" fill="#666">▼</text>\n')
-            else:
-                svg_parts.append(f'  <text x="{text_x}" y="{item_y + 18}" font-family="Arial" font-size="10" text-anchor="middle">{display_name}</text>\n')
-        
+                write(dropdown_tmpl % (col1_x + box_width - 15, item_y + 12, 8))
+
         elif item['type'] == 'field_group':
             # Yellow box for field group
             fg_label = f"{item['name']} ({item['fg_type']})"
-            svg_parts.append(f'  <rect x="{col1_x}" y="{item_y}" width="{box_width}" height="{box_height}" fill="#FFD54F" stroke="#666" stroke-width="1" rx="12"/>\n')
-            svg_parts.append(f'  <text x="{item_center_x}" y="{item_y + 18}" font-family="Arial" font-size="10" text-anchor="middle">{fg_label}</text>\n')
-            
-            # Draw sub-fields in Column 2
-            if item['sub_fields']:
-                sub_y = item_y
-                fg_right_x = col1_x + box_width
-                fg_center_y = item_center_y
-                # Add a small horizontal segment first, then branch to each sub-field
-                branch_x = fg_right_x + 10  # Small gap before branching
-                
-                for sub_field in item['sub_fields']:
-                    sub_center_x = col2_x + box_width / 2
-                    sub_center_y = sub_y + box_height / 2
-                    
-                    # Draw line: from field group -> branch point -> sub-field
-                    svg_parts.append(f'  <line x1="{fg_right_x}" y1="{fg_center_y}" x2="{branch_x}" y2="{fg_center_y}" stroke="#666" stroke-width="1"/>\n')
-                    svg_parts.append(f'  <line x1="{branch_x}" y1="{fg_center_y}" x2="{branch_x}" y2="{sub_center_y}" stroke="#666" stroke-width="1"/>\n')
-                    svg_parts.append(f'  <line x1="{branch_x}" y1="{sub_center_y}" x2="{col2_x}" y2="{sub_center_y}" stroke="#666" stroke-width="1"/>\n')
-                    
-                    # Green box for sub-field
-                    svg_parts.append(f'  <rect x="{col2_x}" y="{sub_y}" width="{box_width}" height="{box_height}" fill="#C5E1A5" stroke="#666" stroke-width="1" rx="12"/>\n')
-                    
-                    # Check if sub-field has dropdown
-                    if sub_field in dropdown_fields:
-                        svg_parts.append(f'  <text x="{sub_center_x}" y="{sub_y + 18}" font-family="Arial" font-size="9" text-anchor="middle">{sub_field}</text>\n')
-                        svg_parts.append(f'  <text x="{col2_x + box_width - 12}" y="{sub_y + 12}" font-family="Arial" font-size="7" fill="#666">▼</text>\n')
-                    else:
-                        svg_parts.append(f'  <text x="{sub_center_x}" y="{sub_y + 18}" font-family="Arial" font-size="9" text-anchor="middle">{sub_field}</text>\n')
-                    
-                    sub_y += spacing
-    
-    svg_parts.append('</svg>')
-    
-    svg_content = ''.join(svg_parts)
-    
-    with open(output_path, 'w') as f:
-        f.write(svg_content)
+            write(_FG_TMPL.substitute(
+                x=col1_x, y=item_y, cx=item_center_x,
+                label_y=item_y + 18, name=fg_label))
+
+            # Sub-field boxes in Column 2
+            for sub_field, sub_y in zip(item['sub_fields'], item.get('sub_ys', ())):
+                write(subfield_tmpl % (
+                    col2_x, sub_y, sub_center_x, sub_y + 18, sub_field))
+                if sub_field in dropdown_fields:
+                    write(dropdown_tmpl % (col2_x + box_width - 12, sub_y + 12, 7))
+
+    buf.write('</svg>')
+
+    return buf.getvalue()
 
 
 def main():
@@ -1367,15 +1730,13 @@ def main():
             step_outputs[step['num']] = step_output
             
             # Save output path info
-            if isinstance(step['output'], str) and step['output'] != 'excel_file':
-                if step['output'].endswith('.json'):
-                    print(f"  📝 Output: {OUTPUT_DIR / step['output']}")
-                if step['output_md']:
-                    print(f"  📝 Documentation: {OUTPUT_DIR / step['output_md']}")
+            if step['is_json_output']:
+                print(f"  📝 Output: {OUTPUT_DIR / step['output']}")
+            if step['has_md']:
+                print(f"  📝 Documentation: {OUTPUT_DIR / step['output_md']}")
         
         except Exception as e:
             print(f"\n❌ ERROR in Step {step['num']}: {e}")
-            import traceback
             traceback.print_exc()
             sys.exit(1)
     
@@ -1385,9 +1746,10 @@ def main():
     print("="*80)
     print(f"\n📁 Output directory: {OUTPUT_DIR}")
     print("\nGenerated files:")
-    for file in sorted(OUTPUT_DIR.rglob('*')):
-        if file.is_file():
-            print(f"  • {file.relative_to(OUTPUT_DIR.parent)}")
+    # One stdout write for the whole listing instead of a flush per line
+    lines = [f"  • {os.path.relpath(file, OUTPUT_DIR.parent)}"
+             for file in sorted(_walk(OUTPUT_DIR))]
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 if __name__ == '__main__':